@@ -157,16 +157,8 @@ def calcola_semaforo_complessivo(sequenza_articoli, df_giacenze):
     # Default (es. tutti bianchi o mix con bianchi) → BIANCO
     return "⚪"
 
-def calcola_disponibilita(cd_ar, df_giacenze):
-    """
-    Calcola il semaforo di disponibilità per un articolo.
-    
-    Returns:
-        tuple: (emoji_semaforo, tooltip_text)
-    """
-    if df_giacenze is None or df_giacenze.empty:
-        return "⚪", "Giacenze non caricate"
-    
+def righe_giacenza(cd_ar, df_giacenze):
+    """Restituisce le righe giacenza di un articolo (con o senza prefisso "DWAR-")"""
     # Normalizza il codice articolo (rimuovi eventuali prefissi e spazi)
     cd_ar_clean = str(cd_ar).strip()
     
@@ -178,6 +170,20 @@ def calcola_disponibilita(cd_ar, df_giacenze):
         cd_ar_no_prefix = cd_ar_clean.replace("DWAR-", "")
         righe_articolo = df_giacenze[df_giacenze["Cd_AR"] == cd_ar_no_prefix]
     
+    return righe_articolo
+
+def calcola_disponibilita(cd_ar, df_giacenze):
+    """
+    Calcola il semaforo di disponibilità per un articolo.
+    
+    Returns:
+        tuple: (emoji_semaforo, tooltip_text)
+    """
+    if df_giacenze is None or df_giacenze.empty:
+        return "⚪", "Giacenze non caricate"
+    
+    righe_articolo = righe_giacenza(cd_ar, df_giacenze)
+    
     if righe_articolo.empty:
         return "🔴", "Non in giacenza"
     
@@ -209,6 +215,55 @@ def calcola_disponibilita(cd_ar, df_giacenze):
     tooltip = " | ".join(info_magazzini) if info_magazzini else "Disponibile (non a scaffale)"
     return "🟡", tooltip
 
+# ---------------------------------------------------------------------------
+# FILTRO DISPONIBILITÀ (applicato durante la ricerca)
+# ---------------------------------------------------------------------------
+
+# Semafori ammessi per ciascuna opzione di filtro (None = nessun filtro)
+FILTRI_SEMAFORO = {
+    "Tutte": None,
+    "Solo verdi 🟢": {"🟢"},
+    "Escludi rossi 🔴": {"🟢", "🟡"},
+}
+
+def crea_filtro_disponibilita(df_giacenze, semafori_ammessi=None, magazzino=None, qta_minima=0):
+    """
+    Crea il filtro per articolo da passare a trova_percorsi.
+    
+    Un articolo è ammesso se il suo semaforo è tra quelli ammessi e, se
+    indicato un magazzino, se la Disp in quel magazzino è >= qta_minima.
+    L'esito è memorizzato per articolo, così ogni codice viene valutato
+    sulle giacenze una sola volta per ricerca.
+    
+    Returns:
+        funzione cd_ar -> bool, oppure None se non c'è nulla da filtrare
+    """
+    if df_giacenze is None or df_giacenze.empty:
+        return None
+    if semafori_ammessi is None and (magazzino is None or qta_minima <= 0):
+        return None
+
+    esiti = {}
+
+    def articolo_ammesso(cd_ar):
+        if cd_ar in esiti:
+            return esiti[cd_ar]
+
+        ammesso = True
+        if semafori_ammessi is not None:
+            semaforo, _ = calcola_disponibilita(cd_ar, df_giacenze)
+            ammesso = semaforo in semafori_ammessi
+
+        if ammesso and magazzino is not None and qta_minima > 0:
+            righe_articolo = righe_giacenza(cd_ar, df_giacenze)
+            disp_magazzino = righe_articolo.loc[righe_articolo["Cd_MG"] == magazzino, "Disp"].sum()
+            ammesso = disp_magazzino >= qta_minima
+
+        esiti[cd_ar] = ammesso
+        return ammesso
+
+    return articolo_ammesso
+
 # ---------------------------------------------------------------------------
 # CARICAMENTO DATI
 # ---------------------------------------------------------------------------
@@ -281,7 +336,7 @@ def costruisci_grafo(df):
     
     return grafo
 
-def trova_percorsi(nodo_corrente, nodo_arrivo, articoli_usati, percorsi_trovati, max_articoli, grafo):
+def trova_percorsi(nodo_corrente, nodo_arrivo, articoli_usati, percorsi_trovati, max_articoli, grafo, filtro=None):
 
     # Se siamo arrivati al nodo finale (con almeno un adattatore), salva percorso
     if nodo_corrente == (nodo_arrivo[0], scambia_genere(nodo_arrivo[1])) and len(articoli_usati) > 0:
@@ -300,10 +355,14 @@ def trova_percorsi(nodo_corrente, nodo_arrivo, articoli_usati, percorsi_trovati,
         # if articolo in articoli_usati: # se vuoi stampare il codice articolo SENZA prefisso
             continue
         
+        # scarta subito gli articoli non disponibili (il ramo non viene esplorato)
+        if filtro is not None and not filtro(cd_ar):
+            continue
+        
         nuovo_nodo_corrente = (vicino[0], scambia_genere(vicino[1]))
         articoli_usati.append(cd_ar) # se vuoi stampare il codice articolo CON prefisso
         # articoli_usati.append(articolo) # se vuoi stampare il codice articolo SENZA prefisso
-        trova_percorsi(nuovo_nodo_corrente, nodo_arrivo, articoli_usati, percorsi_trovati, max_articoli, grafo)
+        trova_percorsi(nuovo_nodo_corrente, nodo_arrivo, articoli_usati, percorsi_trovati, max_articoli, grafo, filtro)
         articoli_usati.pop()
 
 def stampa_sequenza_attacchi(sequenza_articoli, df, attacco_partenza):
@@ -404,6 +463,39 @@ with col3:
         help="Numero massimo di adattatori che si desidera combinare (max 3)"
     )
 
+# Filtri disponibilità (solo con file giacenze caricato)
+filtro_semaforo_str = "Tutte"
+magazzino_filtro = None
+qta_minima = 0
+
+if df_giac is not None:
+    col4, col5, col6 = st.columns([2, 2, 1])
+
+    with col4:
+        filtro_semaforo_str = st.selectbox(
+            "🚦 Disponibilità adattatori",
+            options=list(FILTRI_SEMAFORO.keys()),
+            help="Gli adattatori non ammessi vengono esclusi durante la ricerca"
+        )
+
+    with col5:
+        magazzini = sorted(df_giac["Cd_MG"].dropna().unique().tolist())
+        magazzino_str = st.selectbox(
+            "🏭 Magazzino (q.tà minima)",
+            options=["Nessuno"] + magazzini,
+            help="Richiede per ogni adattatore una Disp minima nel magazzino selezionato"
+        )
+        magazzino_filtro = None if magazzino_str == "Nessuno" else magazzino_str
+
+    with col6:
+        qta_minima = st.number_input(
+            "🔢 Q.tà minima",
+            min_value=0,
+            value=1,
+            disabled=magazzino_filtro is None,
+            help="Disp minima per adattatore nel magazzino selezionato"
+        )
+
 # ---------------------------------------------------------------------------
 # RICERCA PERCORSI
 # ---------------------------------------------------------------------------
@@ -418,9 +510,17 @@ if st.button("🔍 RICERCA ADATTATORI", type="primary", use_container_width=True
         # Costruisci grafo
         grafo = costruisci_grafo(df)
         
+        # Filtro disponibilità applicato per articolo durante la ricerca
+        filtro = crea_filtro_disponibilita(
+            df_giac,
+            semafori_ammessi=FILTRI_SEMAFORO[filtro_semaforo_str],
+            magazzino=magazzino_filtro,
+            qta_minima=qta_minima
+        )
+        
         # Trova percorsi
         percorsi_trovati = []
-        trova_percorsi(attacco_partenza, attacco_arrivo, [], percorsi_trovati, max_articoli, grafo)
+        trova_percorsi(attacco_partenza, attacco_arrivo, [], percorsi_trovati, max_articoli, grafo, filtro)
         
         # Ordina per numero articoli
         percorsi_trovati = sorted(percorsi_trovati, key=len)
@@ -625,6 +725,8 @@ if st.button("🔍 RICERCA ADATTATORI", type="primary", use_container_width=True
     else:
         st.warning("⚠️ Nessuna combinazione trovata con gli attacchi selezionati")
         st.info("💡 Prova ad aumentare il numero massimo di adattatori impiegabili (max=3)")
+        if filtro is not None:
+            st.info("💡 Prova ad allentare i filtri di disponibilità")
 
 # ---------------------------------------------------------------------------
 # SIDEBAR INFO
@@ -653,7 +755,8 @@ with st.sidebar:
     1. Seleziona attacco di partenza (dell'adattatore desiderato)
     2. Seleziona attacco di arrivo 
     3. Imposta n° max adattori impiegabili
-    4. Clicca "RICERCA ADATTATORI"
+    4. (Con giacenze) Imposta eventuali filtri di disponibilità
+    5. Clicca "RICERCA ADATTATORI"
 
     **Risultati:**
     - Verranno mostrate tutte le combinazioni possibili.